@@ -22,8 +22,10 @@ def system_diagnostic(db: Session = Depends(get_db)):
         "status": "healthy",
         "checks": {}
     }
-    from datetime import datetime
-    results["timestamp"] = datetime.utcnow().isoformat()
+    from datetime import datetime, timezone
+    import time
+    started_ns = time.monotonic_ns()
+    results["timestamp"] = datetime.now(timezone.utc).isoformat()
     
     # 1. Database Check
     try:
@@ -58,6 +60,7 @@ def system_diagnostic(db: Session = Depends(get_db)):
         "python_version": os.sys.version.split()[0]
     }
 
+    results["duration_ms"] = (time.monotonic_ns() - started_ns) // 1_000_000
     return results
 
 @router.post("/test-mcp-compatibility")
@@ -141,10 +144,11 @@ def check_mcp_database_status(db: Session = Depends(get_db)):
         # Check database connection
         db.execute(text("SELECT 1"))
         
-        # Check MCP tables
-        mcp_tables_result = db.execute(text("""
-            SELECT COUNT(*) FROM information_schema.tables 
-            WHERE table_schema='public' AND table_name LIKE 'mcp_%'
+        # Check MCP tables (one pg_class scan; '_' is escaped so it is not a wildcard)
+        mcp_tables_result = db.execute(text(r"""
+            SELECT COUNT(*) FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = 'public' AND c.relkind = 'r' AND c.relname LIKE 'mcp\_%'
         """)).scalar()
         
         # Check MCP-specific columns
@@ -173,23 +177,18 @@ def check_mcp_database_status(db: Session = Depends(get_db)):
             )
         """)).scalar()
         
+        # Validate schema completeness with catalog lookups instead of
+        # scanning each table (a failed scan would also abort the transaction)
+        required_tables = ['mcp_servers', 'mcp_server_logs', 'agent_mcp_servers', 'mcp_tool_usage']
+        found_tables = db.execute(text("""
+            SELECT t FROM unnest(CAST(:tables AS text[])) AS t
+            WHERE to_regclass('public.' || t) IS NOT NULL
+        """), {"tables": required_tables}).scalars().all()
+        
         # Count MCP servers if table exists
         mcp_server_count = 0
-        try:
+        if "mcp_servers" in found_tables:
             mcp_server_count = db.execute(text("SELECT COUNT(*) FROM mcp_servers")).scalar()
-        except:
-            pass
-        
-        # Validate schema completeness
-        required_tables = ['mcp_servers', 'mcp_server_logs', 'agent_mcp_servers', 'mcp_tool_usage']
-        found_tables = []
-        
-        for table in required_tables:
-            try:
-                db.execute(text(f"SELECT COUNT(*) FROM {table}"))
-                found_tables.append(table)
-            except:
-                pass
         
         schema_complete = (
             len(found_tables) == len(required_tables) and
@@ -9,7 +9,7 @@ from app.schemas.schemas import (
     SessionAnalyticsResponse, ActivityTimelineItem, BulkDeleteRequest, BulkDeleteResponse
 )
 from app.crud.crud import (
-    create_chat_session, get_chat_session, get_chat_sessions, delete_chat_session,
+    create_chat_session, get_chat_session, get_chat_sessions, delete_chat_session, bulk_delete_chat_sessions,
     get_chat_messages, create_chat_message, get_session_knowledge, archive_session,
     get_session_analytics
 )
@@ -293,8 +293,7 @@ def get_session_knowledge_endpoint(session_id: int, db: Session = Depends(get_db
 @router.post("/bulk-delete", response_model=BulkDeleteResponse)
 def bulk_delete_sessions(request: BulkDeleteRequest, db: Session = Depends(get_db)):
     """Delete multiple sessions at once"""
-    deleted_count = db.query(ChatSession).filter(ChatSession.id.in_(request.session_ids)).delete(synchronize_session=False)
-    db.commit()
+    deleted_count = bulk_delete_chat_sessions(db, session_ids=request.session_ids)
     return BulkDeleteResponse(message=f"Successfully deleted {deleted_count} sessions")
 
 
@@ -96,6 +96,16 @@ def delete_chat_session(db: Session, session_id: int) -> bool:
     return True
 
 
+def bulk_delete_chat_sessions(db: Session, session_ids: List[int]) -> int:
+    # Delete associated messages and knowledge files first, as in delete_chat_session
+    db.query(ChatMessage).filter(ChatMessage.session_id.in_(session_ids)).delete(synchronize_session=False)
+    db.query(SessionKnowledge).filter(SessionKnowledge.session_id.in_(session_ids)).delete(synchronize_session=False)
+    
+    deleted_count = db.query(ChatSession).filter(ChatSession.id.in_(session_ids)).delete(synchronize_session=False)
+    db.commit()
+    return deleted_count
+
+
 def archive_session(db: Session, session_id: int) -> Optional[ChatSession]:
     """Archive a session (soft delete)"""
     session = db.query(ChatSession).filter(ChatSession.id == session_id).first()
@@ -7,14 +7,14 @@ Creates and migrates MCP-related tables and schemas
 import os
 import asyncio
 import sys
-from typing import List, Dict, Any
-from datetime import datetime
+from typing import List, Dict, Any, Optional
+from datetime import datetime, timezone
 import json
 
 # Add backend to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, text, bindparam
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import SQLAlchemyError, OperationalError
 from dotenv import load_dotenv
@@ -22,6 +22,25 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+# MCP tables created by the migration
+REQUIRED_TABLES = frozenset({
+    'mcp_servers',
+    'mcp_server_logs',
+    'agent_mcp_servers',
+    'mcp_tool_usage',
+    'mcp_system_metrics'
+})
+
+# MCP columns expected on existing tables
+REQUIRED_COLUMNS = frozenset({
+    ('agents', 'mcp_servers'),
+    ('chat_messages', 'tools_used'),
+    ('chat_messages', 'mcp_server_responses')
+})
+
+# Every table the schema check reads, bound as a single query parameter
+SCHEMA_TABLES = sorted(REQUIRED_TABLES | {table for table, _ in REQUIRED_COLUMNS})
+
 
 class MCPDatabaseSetup:
     """Handle MCP database schema setup and migration"""
@@ -29,8 +48,9 @@ class MCPDatabaseSetup:
     def __init__(self):
         # Database connection
         self.db_url = os.getenv("DATABASE_URL", "sqlite:///chatbot.db")
-        self.engine = create_engine(self.db_url)
-        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+        # One small pre-pinged pool shared by every step of the run
+        self.engine = create_engine(self.db_url, pool_pre_ping=True, pool_size=2, max_overflow=0)
+        self.SessionLocal = sessionmaker(bind=self.engine, autocommit=False, autoflush=False)
         
         # Check if PostgreSQL or SQLite
         self.is_postgres = "postgresql" in self.db_url.lower()
@@ -49,19 +69,70 @@ class MCPDatabaseSetup:
             print(f"FAIL: Database connection failed: {e}")
             return False
     
-    async def run_migration(self) -> bool:
-        """Run the MCP schema migration"""
+    def _load_schema(self, session) -> Dict[str, set]:
+        """Return {table: {columns}} for every MCP-related table from one catalog query"""
+        if self.is_postgres:
+            rows = session.execute(text("""
+                SELECT table_name, column_name
+                FROM information_schema.columns
+                WHERE table_schema = 'public' AND table_name = ANY(:tables)
+            """), {"tables": SCHEMA_TABLES}).fetchall()
+        else:
+            rows = session.execute(
+                text("""
+                    SELECT m.name, p.name
+                    FROM sqlite_master m JOIN pragma_table_info(m.name) p
+                    WHERE m.type = 'table' AND m.name IN :tables
+                """).bindparams(bindparam("tables", expanding=True)),
+                {"tables": SCHEMA_TABLES}
+            ).fetchall()
+        
+        schema: Dict[str, set] = {}
+        for table_name, column_name in rows:
+            schema.setdefault(table_name, set()).add(column_name)
+        return schema
+    
+    def _read_schema(self) -> Dict[str, set]:
+        """Load the MCP schema on its own pooled session"""
+        with self.SessionLocal() as session:
+            return self._load_schema(session)
+    
+    def _count_servers(self) -> int:
+        """Count configured MCP servers on its own pooled session"""
+        with self.SessionLocal() as session:
+            return session.execute(text("SELECT COUNT(*) FROM mcp_servers")).scalar()
+    
+    async def check_schema_current(self) -> bool:
+        """Check whether every MCP table and column already exists"""
+        try:
+            schema = self._read_schema()
+        except Exception as e:
+            print(f"INFO: Could not inspect existing schema: {e}")
+            return False
+        
+        return (
+            REQUIRED_TABLES <= schema.keys()
+            and all(column in schema.get(table, ()) for table, column in REQUIRED_COLUMNS)
+        )
+    
+    async def run_migration(self, migration_sql: Optional[List[str]] = None) -> bool:
+        """Run the MCP schema migration, or just the given statements"""
         try:
             print("\nRunning MCP Schema Migration...")
             
             with self.engine.begin() as conn:
                 # Execute the migration SQL
-                migration_sql = self._get_migration_sql()
+                if migration_sql is None:
+                    migration_sql = self._get_migration_sql()
                 
                 for sql_statement in migration_sql:
                     if sql_statement.strip():
+                        statement = text(sql_statement)
+                        # Default servers run from the directory setup is started in
+                        if ":working_directory" in sql_statement:
+                            statement = statement.bindparams(working_directory=os.getcwd())
                         try:
-                            conn.execute(text(sql_statement))
+                            conn.execute(statement)
                         except Exception as e:
                             print(f"Error executing: {sql_statement[:50]}...")
                             print(f"Error: {e}")
@@ -82,6 +153,13 @@ class MCPDatabaseSetup:
         else:
             return self._get_sqlite_migration_sql()
     
+    def _get_upkeep_sql(self) -> List[str]:
+        """Index and default-server statements, re-run even on a complete schema"""
+        return [
+            sql_statement for sql_statement in self._get_migration_sql()
+            if sql_statement.lstrip().startswith(("CREATE INDEX", "INSERT"))
+        ]
+    
     def _get_postgres_migration_sql(self) -> List[str]:
         """PostgreSQL migration SQL"""
         return [
@@ -217,10 +295,10 @@ class MCPDatabaseSetup:
             """
             INSERT INTO mcp_servers (id, name, description, command, arguments, environment, working_directory, enabled, auto_start, health_check_interval, status)
             VALUES 
-                ('filesystem-1', 'File System Server', 'Local file system operations (list, read, search)', 'python', '["mcp_file_server.py"]', '{}', CURRENT_DIRECTORY, TRUE, TRUE, 30, 'stopped'),
-                ('database-1', 'Database Server', 'Database query and management tools', 'npx', '["-y", "@modelcontextprotocol/server-postgres"]', '{"DATABASE_URL": "sqlite:///chatbot.db"}', CURRENT_DIRECTORY, TRUE, TRUE, 30, 'stopped'),
-                ('git-1', 'Git Server', 'Git repository operations and file version control', 'npx', '["-y", "@modelcontextprotocol/server-git"]', '{}', CURRENT_DIRECTORY, TRUE, TRUE, 30, 'stopped'),
-                ('web-fetch-1', 'Web Fetch Server', 'HTTP requests and web content fetching', 'npx', '["-y", "@modelcontextprotocol/server-fetch"]', '{}', CURRENT_DIRECTORY, TRUE, TRUE, 30, 'stopped')
+                ('filesystem-1', 'File System Server', 'Local file system operations (list, read, search)', 'python', '["mcp_file_server.py"]', '{}', :working_directory, TRUE, TRUE, 30, 'stopped'),
+                ('database-1', 'Database Server', 'Database query and management tools', 'npx', '["-y", "@modelcontextprotocol/server-postgres"]', '{"DATABASE_URL": "sqlite:///chatbot.db"}', :working_directory, TRUE, TRUE, 30, 'stopped'),
+                ('git-1', 'Git Server', 'Git repository operations and file version control', 'npx', '["-y", "@modelcontextprotocol/server-git"]', '{}', :working_directory, TRUE, TRUE, 30, 'stopped'),
+                ('web-fetch-1', 'Web Fetch Server', 'HTTP requests and web content fetching', 'npx', '["-y", "@modelcontextprotocol/server-fetch"]', '{}', :working_directory, TRUE, TRUE, 30, 'stopped')
             ON CONFLICT (id) DO NOTHING;
             """
         ]
@@ -358,12 +436,12 @@ class MCPDatabaseSetup:
             
             # Insert default MCP servers
             """
-            INSERT OR REPLACE INTO mcp_servers (id, name, description, command, arguments, environment, working_directory, enabled, auto_start, health_check_interval, status)
+            INSERT OR IGNORE INTO mcp_servers (id, name, description, command, arguments, environment, working_directory, enabled, auto_start, health_check_interval, status)
             VALUES 
-                ('filesystem-1', 'File System Server', 'Local file system operations (list, read, search)', 'python', '["mcp_file_server.py"]', '{}', CURRENT_DIRECTORY, 1, 1, 30, 'stopped'),
-                ('database-1', 'Database Server', 'Database query and management tools', 'npx', '["-y", "@modelcontextprotocol/server-postgres"]', '{"DATABASE_URL": "sqlite:///chatbot.db"}', CURRENT_DIRECTORY, 1, 1, 30, 'stopped'),
-                ('git-1', 'Git Server', 'Git repository operations and file version control', 'npx', '["-y", "@modelcontextprotocol/server-git"]', '{}', CURRENT_DIRECTORY, 1, 1, 30, 'stopped'),
-                ('web-fetch-1', 'Web Fetch Server', 'HTTP requests and web content fetching', 'npx', '["-y", "@modelcontextprotocol/server-fetch"]', '{}', CURRENT_DIRECTORY, 1, 1, 30, 'stopped')
+                ('filesystem-1', 'File System Server', 'Local file system operations (list, read, search)', 'python', '["mcp_file_server.py"]', '{}', :working_directory, 1, 1, 30, 'stopped'),
+                ('database-1', 'Database Server', 'Database query and management tools', 'npx', '["-y", "@modelcontextprotocol/server-postgres"]', '{"DATABASE_URL": "sqlite:///chatbot.db"}', :working_directory, 1, 1, 30, 'stopped'),
+                ('git-1', 'Git Server', 'Git repository operations and file version control', 'npx', '["-y", "@modelcontextprotocol/server-git"]', '{}', :working_directory, 1, 1, 30, 'stopped'),
+                ('web-fetch-1', 'Web Fetch Server', 'HTTP requests and web content fetching', 'npx', '["-y", "@modelcontextprotocol/server-fetch"]', '{}', :working_directory, 1, 1, 30, 'stopped')
             ;
             """
         ]
@@ -375,38 +453,38 @@ class MCPDatabaseSetup:
             
             with self.SessionLocal() as session:
                 # Check if MCP servers exist
-                if self.is_postgres:
-                    mcp_servers = session.execute(
-                        "SELECT COUNT(*) FROM mcp_servers"
-                    ).scalar()
-                else:
-                    mcp_servers = session.execute(
-                        "SELECT COUNT(*) FROM mcp_servers"
-                    ).scalar()
+                mcp_servers = session.execute(
+                    text("SELECT COUNT(*) FROM mcp_servers")
+                ).scalar()
                 
                 print(f"Found {mcp_servers} MCP servers in database")
                 
                 # Record system metrics
-                current_time = datetime.utcnow()
+                timestamp = datetime.now(timezone.utc).isoformat()
                 
                 metrics_data = [
                     ('server_count', float(mcp_servers), {
-                        'timestamp': current_time.isoformat(),
+                        'timestamp': timestamp,
                         'server_types': ['filesystem', 'database', 'git', 'web-fetch']
                     }),
                     ('database_ready', 1.0, {
-                        'timestamp': current_time.isoformat(),
+                        'timestamp': timestamp,
                         'migration_status': 'completed',
                         'database_type': 'postgresql' if self.is_postgres else 'sqlite'
                     })
                 ]
                 
+                insert_metric = text(
+                    "INSERT INTO mcp_system_metrics (metric_type, metric_value, metadata) "
+                    "VALUES (:metric_type, :metric_value, :metadata)"
+                )
                 for metric_type, metric_value, metadata in metrics_data:
                     try:
-                        session.execute(
-                            "INSERT INTO mcp_system_metrics (metric_type, metric_value, metadata) VALUES (?, ?, ?)",
-                            (metric_type, metric_value, json.dumps(metadata))
-                        )
+                        session.execute(insert_metric, {
+                            "metric_type": metric_type,
+                            "metric_value": metric_value,
+                            "metadata": json.dumps(metadata)
+                        })
                         print(f"  ✓ Recorded metric: {metric_type} = {metric_value}")
                     except Exception as e:
                         print(f"  ⚠️ Warning: Failed to record metric {metric_type}: {e}")
@@ -431,8 +509,14 @@ class MCPDatabaseSetup:
             print("\nFAIL: Database setup failed - connection error")
             return False
         
-        # Step 2: Run migration
-        if not await self.run_migration():
+        # Step 2: Run migration. When every table and column already exists
+        # only the idempotent index and default-server statements run, so a
+        # database missing those is still repaired
+        migration_sql = None
+        if await self.check_schema_current():
+            print("\nPASS: MCP schema already up to date - only ensuring indexes and default servers")
+            migration_sql = self._get_upkeep_sql()
+        if not await self.run_migration(migration_sql):
             print("\nFAIL: Database setup failed - migration error")
             return False
         
@@ -441,29 +525,33 @@ class MCPDatabaseSetup:
             print("\n⚠️ Database setup completed but data seeding failed")
             # Don't fail setup for seeding issues
         
-        print("\n" + "=" * 60)
-        print("PASS: MCP DATABASE SETUP COMPLETE!")
-        print("=" * 60)
-        
-        print("\nDatabase Schema Summary:")
-        print(f"  • mcp_servers: MCP server configurations")
-        print(f"  • mcp_server_logs: Server logging and monitoring")
-        print(f"  • agent_mcp_servers: Agent-server relationships")
-        print(f"  • mcp_tool_usage: Tool execution tracking")
-        print(f"  • mcp_system_metrics: System performance metrics")
-        
-        print("\nDatabase Features:")
-        print(f"  • Foreign key constraints for data integrity")
-        print(f"  • Indexes for optimal query performance")
-        print(f"  • JSON fields for flexible data storage")
-        print(f"  • Timestamp tracking for temporal queries")
-        print(f"  • Cascade deletes for automatic cleanup")
-        
-        print("\nDefault MCP Servers Configured:")
-        print("  • File System Server - Local file operations")
-        print("  • Database Server - PostgreSQL operations")
-        print("  • Git Server - Version control integration")
-        print("  • Web Fetch Server - HTTP requests and scraping")
+        # The closing summary is static; emit it as one write
+        sys.stdout.write("\n".join([
+            "",
+            "=" * 60,
+            "PASS: MCP DATABASE SETUP COMPLETE!",
+            "=" * 60,
+            "",
+            "Database Schema Summary:",
+            "  • mcp_servers: MCP server configurations",
+            "  • mcp_server_logs: Server logging and monitoring",
+            "  • agent_mcp_servers: Agent-server relationships",
+            "  • mcp_tool_usage: Tool execution tracking",
+            "  • mcp_system_metrics: System performance metrics",
+            "",
+            "Database Features:",
+            "  • Foreign key constraints for data integrity",
+            "  • Indexes for optimal query performance",
+            "  • JSON fields for flexible data storage",
+            "  • Timestamp tracking for temporal queries",
+            "  • Cascade deletes for automatic cleanup",
+            "",
+            "Default MCP Servers Configured:",
+            "  • File System Server - Local file operations",
+            "  • Database Server - PostgreSQL operations",
+            "  • Git Server - Version control integration",
+            "  • Web Fetch Server - HTTP requests and scraping",
+        ]) + "\n")
         
         return True
     
@@ -472,75 +560,38 @@ class MCPDatabaseSetup:
         try:
             print("\nVerifying MCP Database Setup...")
             
-            with self.SessionLocal() as session:
-                # Check all MCP tables exist
-                tables_to_check = [
-                    'mcp_servers',
-                    'mcp_server_logs', 
-                    'agent_mcp_servers',
-                    'mcp_tool_usage',
-                    'mcp_system_metrics'
-                ]
-                
-                for table in tables_to_check:
-                    if self.is_postgres:
-                        result = session.execute(f"SELECT EXISTS (SELECT FROM information_schema.tables WHERE table_name = '{table}')").scalar()
-                    else:
-                        result = session.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{table}'").fetchone()
-                    
-                    status = "✅" if result else "❌"
-                    print(f"  {status} Table '{table}'")
-                
-                # Check if default servers exist
-                if self.is_postgres:
-                    server_count = session.execute("SELECT COUNT(*) FROM mcp_servers").scalar()
-                else:
-                    server_count = session.execute("SELECT COUNT(*) FROM mcp_servers").scalar()
-                
-                print(f"  ✅ MCP servers configured: {server_count}")
-                
-                # Check agents table has mcp_servers column
-                if self.is_postgres:
-                    has_column = session.execute("""
-                        SELECT EXISTS (
-                            SELECT FROM information_schema.columns 
-                            WHERE table_name = 'agents' AND column_name = 'mcp_servers'
-                        )
-                    """).scalar()
-                else:
-                    has_column = session.execute("PRAGMA table_info(agents)").fetchall()
-                    has_column = any('mcp_servers' in str(col) for col in has_column)
-                
-                column_status = "✅" if has_column else "❌"
-                print(f"  {column_status} Agents table has mcp_servers column")
-                
-                # Check chat_messages table has MCP columns
-                if self.is_postgres:
-                    tools_column = session.execute("""
-                        SELECT EXISTS (
-                            SELECT FROM information_schema.columns 
-                            WHERE table_name = 'chat_messages' AND column_name = 'tools_used'
-                        )
-                    """).scalar()
-                    responses_column = session.execute("""
-                        SELECT EXISTS (
-                            SELECT FROM information_schema.columns 
-                            WHERE table_name = 'chat_messages' AND column_name = 'mcp_server_responses'
-                        )
-                    """).scalar()
-                else:
-                    columns = session.execute("PRAGMA table_info(chat_messages)").fetchall()
-                    tools_column = any('tools_used' in str(col) for col in columns)
-                    responses_column = any('mcp_server_responses' in str(col) for col in columns)
-                
-                tools_status = "✅" if tools_column else "❌"
-                responses_status = "✅" if responses_column else "❌"
-                print(f"  {tools_status} Chat messages have tools_used column")
-                print(f"  {responses_status} Chat messages have mcp_server_responses column")
-                
-                session.commit()
+            # The catalog query and the server count are independent, so run
+            # them side by side on the two pooled connections
+            schema, server_count = await asyncio.gather(
+                asyncio.to_thread(self._read_schema),
+                asyncio.to_thread(self._count_servers)
+            )
+            
+            # Collect the report and write it in one go
+            log = []
+            
+            # Check all MCP tables exist
+            for table in sorted(REQUIRED_TABLES):
+                status = "✅" if table in schema else "❌"
+                log.append(f"  {status} Table '{table}'")
+            
+            log.append(f"  ✅ MCP servers configured: {server_count}")
+            
+            has_column = 'mcp_servers' in schema.get('agents', ())
+            tools_column = 'tools_used' in schema.get('chat_messages', ())
+            responses_column = 'mcp_server_responses' in schema.get('chat_messages', ())
+            
+            column_status = "✅" if has_column else "❌"
+            log.append(f"  {column_status} Agents table has mcp_servers column")
+            
+            tools_status = "✅" if tools_column else "❌"
+            responses_status = "✅" if responses_column else "❌"
+            log.append(f"  {tools_status} Chat messages have tools_used column")
+            log.append(f"  {responses_status} Chat messages have mcp_server_responses column")
             
-            print("\n✅ Database verification completed successfully!")
+            log.append("")
+            log.append("✅ Database verification completed successfully!")
+            sys.stdout.write("\n".join(log) + "\n")
             return True
             
         except Exception as e:
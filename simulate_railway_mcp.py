@@ -6,6 +6,7 @@ Creates PostgreSQL database if needed and prepares for MCP schema
 
 import os
 import sys
+import functools
 import subprocess
 import psycopg2
 import logging
@@ -118,7 +119,8 @@ class RailwayPostgreSQLManager:
             logger.error(f"❌ Database setup failed: {e}")
             return False
 
-if __name__ == "__main__":
+def simulate_railway_postgres_setup():
+    """Simulate provisioning the Railway PostgreSQL service"""
     # Setup logging
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s: %(message)s')
     
@@ -156,6 +158,15 @@ if __name__ == "__main__":
         print(f"❌ Railway PostgreSQL setup failed: {e}")
         return 1
 
+@functools.lru_cache(maxsize=1)
+def load_alembic_config(ini_path="alembic.ini"):
+    """Parse alembic.ini and resolve its script directory once per run"""
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+    
+    config = Config(ini_path)
+    return config, ScriptDirectory.from_config(config)
+
 def simulate_railway_mcp_setup():
     """Simulate the complete Railway MCP setup process"""
     
@@ -172,11 +183,11 @@ def simulate_railway_mcp_setup():
     
     # Check alembic.ini
     try:
-        import alembic
-        config = alembic.config.Config("alembic.ini")
+        config, script_dir = load_alembic_config()
         script_location = config.get_main_option("script_location")
         print(f"   ✅ Alembic configured")
         print(f"   📄 Script location: {script_location}")
+        print(f"   📄 Head revision: {script_dir.get_current_head()}")
     except Exception as e:
         print(f"   ⚠️ Alembic config error: {e}")
         return False
@@ -14,6 +14,11 @@ from datetime import datetime
 from pathlib import Path
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Load environment variables from codebase .env
 load_dotenv()
 
@@ -326,13 +331,24 @@ class ZaiLatencyTester:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"zai_latency_test_{timestamp}.json"
         
-        with open(filename, 'w') as f:
+        payload = {
+            "timestamp": datetime.now().isoformat(),
+            "api_key": self.api_key[:20] + "...",
+            "results": results
+        }
+
+        if orjson is not None:
+            # orjson encodes datetimes natively; str() still covers anything else
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(
+                    payload,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+                    default=str
+                ))
+        else:
             import json
-            json.dump({
-                "timestamp": datetime.now().isoformat(),
-                "api_key": self.api_key[:20] + "...",
-                "results": results
-            }, f, indent=2, default=str)
+            with open(filename, 'w') as f:
+                json.dump(payload, f, indent=2, default=str)
         
         print(f"\n💾 Results saved to: {filename}")
 
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Offline checks for the MCP chatbot (no API key or MCP server needed)
+"""
+
+import asyncio
+from types import SimpleNamespace
+import orjson
+from zai_mcp_chatbot import MCPEnabledZAIChatbot, _tool_call_frame
+
+class FakeCompletions:
+    """Stands in for client.chat.completions and counts model calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        if kwargs.get("stream"):
+            async def chunks():
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="Four"))])
+            return chunks()
+        message = SimpleNamespace(content="Four", tool_calls=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="stop")])
+
+def make_chatbot():
+    """Return a chatbot with a fake model client and no MCP tools"""
+    chatbot = MCPEnabledZAIChatbot()
+    completions = FakeCompletions()
+    chatbot.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    chatbot._cache_tool_prompt()
+    return chatbot, completions
+
+def test_response_cache():
+    """A repeated opening question is answered from the cache; follow-ups are not"""
+    print("Testing response cache")
+    print("=" * 50)
+
+    async def run():
+        chatbot, completions = make_chatbot()
+
+        first = await chatbot.chat_with_mcp("What is 2 + 2?")
+        calls_after_first = completions.calls
+
+        # Follow-ups depend on earlier turns and always reach the model
+        await chatbot.chat_with_mcp("explain more")
+        await chatbot.chat_with_mcp("explain more")
+        assert completions.calls > calls_after_first
+
+        # The same opening question in a new conversation is a cache hit
+        chatbot.reset_conversation()
+        calls_before_repeat = completions.calls
+        repeat = await chatbot.chat_with_mcp("  what is 2 + 2?")
+        assert repeat == first
+        assert completions.calls == calls_before_repeat
+        assert len(chatbot._response_cache) == 1
+
+    asyncio.run(run())
+    print("PASS: Repeated opening question served from cache")
+
+def test_tool_call_frame():
+    """The prebuilt tools/call frame matches a plain orjson serialization"""
+    print("Testing tools/call frame")
+    print("=" * 50)
+
+    cases = [
+        ("list_files", {}),
+        ("read_file", {"path": 'say "hi"\\there\n.txt'}),
+        ("search_code", {"pattern": "caf\u00e9 \u4f60\u597d \U0001f600"}),
+        ("analyze_file_structure", {"file_path": "a.py", "options": {"depth": [1, 2.5, None, True], "tags": {"x": "y"}}}),
+    ]
+    for request_id, (tool_name, arguments) in enumerate(cases, start=3):
+        expected = orjson.dumps({
+            "jsonrpc": "2.0",
+            "method": "tools/call",
+            "id": request_id,
+            "params": {"name": tool_name, "arguments": arguments}
+        }, option=orjson.OPT_APPEND_NEWLINE)
+        assert _tool_call_frame(request_id, tool_name, arguments) == expected, tool_name
+
+    print(f"PASS: {len(cases)} frames match orjson.dumps")
+
+if __name__ == "__main__":
+    test_response_cache()
+    test_tool_call_frame()
@@ -21,7 +21,7 @@ try:
     from sqlalchemy import create_engine, text
     from dotenv import load_dotenv
     
-   	load_dotenv()
+    load_dotenv()
     
     db_url = os.getenv("DATABASE_URL", "postgresql://localhost/postgres")
     print(f"Database URL: {db_url}")
@@ -40,14 +40,16 @@ try:
             'mcp_system_metrics'
         ]
         
+        # One parameterized lookup for every table instead of a literal
+        # SQL string per table
+        existing_tables = set(conn.execute(text("""
+            SELECT table_name FROM information_schema.tables
+            WHERE table_schema = 'public' AND table_name = ANY(:tables)
+        """), {"tables": tables_to_check}).scalars().all())
+        
         all_tables_exist = True
         for table in tables_to_check:
-            result = conn.execute(text(f"""
-                SELECT EXISTS (
-                    SELECT FROM information_schema.tables 
-                    WHERE table_name = '{table}'
-                )
-            """)).scalar()
+            result = table in existing_tables
             
             status = "PASS" if result else "FAIL"
             exists_text = "Yes" if result else "No"
@@ -59,16 +61,17 @@ try:
         if all_tables_exist:
             print("PASS: All MCP tables exist in database")
             
-            # Check agent table structure
+            # Check agent and message table structure
             columns_result = conn.execute(text("""
-                SELECT column_name 
+                SELECT table_name, column_name 
                 FROM information_schema.columns 
-                WHERE table_name = 'agents'
-            """)).fetchall()
+                WHERE table_schema = 'public' AND table_name = ANY(:tables)
+            """), {"tables": ["agents", "chat_messages"]}).fetchall()
+            present_columns = {(row[0], row[1]) for row in columns_result}
             
-            mcp_column_exists = any('mcp_servers' in str(col) for col in columns_result)
-            tools_column_exists = any('tools_used' in str(col) for col in columns_result)
-            mcp_responses_column_exists = any('mcp_server_responses' in str(col) for col in columns_result)
+            mcp_column_exists = ('agents', 'mcp_servers') in present_columns
+            tools_column_exists = ('chat_messages', 'tools_used') in present_columns
+            mcp_responses_column_exists = ('chat_messages', 'mcp_server_responses') in present_columns
             
             print(f"  {'PASS' if mcp_column_exists else 'FAIL'} Agents table has mcp_servers column")
             print(f"  {'PASS' if tools_column_exists else 'FAIL'} Messages table has tools_used column")
@@ -7,76 +7,91 @@ Quick test for basic functionality before comprehensive testing
 
 import os
 import sys
+import time
+import asyncio
+import httpx
 import requests
 
+# Read configuration once so every check sees the same values
+PROD_URL = os.getenv("PRODUCTION_URL", "")
+ZAI_API_KEY = os.getenv("ZAI_API_KEY", "")
+HEALTH_URL = f"{PROD_URL}/api/v1/ui/health"
+
+if "--require-env" in sys.argv and not PROD_URL:
+    sys.exit("ERROR: PRODUCTION_URL not set (required by --require-env)")
+
+# Health URLs already seen healthy this run; failures are always re-probed
+_healthy_urls = set()
+
 def check_health():
     """Check if production site is accessible and healthy"""
-    prod_url = os.getenv("PRODUCTION_URL", "")
-    
-    if not prod_url:
+    if not PROD_URL:
         print("ERROR: PRODUCTION_URL not set.")
         print("Set: PRODUCTION_URL=https://your-app.railway.app")
         return False
-    
+
+    if HEALTH_URL in _healthy_urls:
+        return True
+
     try:
-        response = requests.get(f"{prod_url}/api/v1/ui/health", timeout=10)
+        response = requests.get(HEALTH_URL, timeout=10)
         status_ok = response.status_code == 200
-        
+
         if status_ok:
             data = response.json()
             print(f"✅ Health check passed")
             print(f"   Status: {data.get('status')}")
+            _healthy_urls.add(HEALTH_URL)
             return True
+        print(f"❌ Health check failed: HTTP {response.status_code}")
+        return False
     except Exception as e:
         print(f"❌ Health check failed: {str(e)}")
         return False
 
-def test_basic_api():
+async def test_basic_api(client):
     """Test basic API functionality"""
-    prod_url = os.getenv("PRODUCTION_URL")
-    
     try:
-        # Load environment
-        prod_url = os.getenv("PRODUCTION_URL", "")
-        if prod_url:
-            print(f"Testing API at: {prod_url}")
-            
-            # Test multiple endpoints
-            endpoints = [
-                f"{prod_url}/api/v1/agents/",
-                f"{prod_url}/api/v1/sessions/",
-                f"{prod_url}/api/v1/ui/health/"
-            ]
-            
-            api_health = True
-            for endpoint in endpoints:
-                try:
-                    response = requests.get(endpoint, timeout=2)
-                    if response.status_code == 200:
-                        print(f"✅ {endpoint}")
-                        else:
-                            api_health = False
-                except Exception:
-                    api_health = False
-                        api_health = False
-                    
-            print(f"API Health: {'✅' if api_health else '❌ FAILED'}")
-            
-            return api_health
-            
+        if not PROD_URL:
+            return False
+
+        print(f"Testing API at: {PROD_URL}")
+
+        # Test multiple endpoints
+        endpoints = [
+            f"{PROD_URL}/api/v1/agents/",
+            f"{PROD_URL}/api/v1/sessions/",
+            f"{PROD_URL}/api/v1/ui/health/"
+        ]
+
+        # Probe all endpoints at once; over HTTP/2 they share one connection
+        responses = await asyncio.gather(
+            *(client.get(endpoint, timeout=2.0) for endpoint in endpoints),
+            return_exceptions=True
+        )
+
+        api_health = True
+        for endpoint, response in zip(endpoints, responses):
+            if isinstance(response, Exception) or response.status_code != 200:
+                print(f"❌ {endpoint}")
+                api_health = False
+            else:
+                print(f"✅ {endpoint}")
+
+        print(f"API Health: {'✅' if api_health else '❌ FAILED'}")
+
+        return api_health
+
     except Exception as e:
         print(f"ERROR: API test failed: {str(e)}")
         return False
 
-def test_agent_operations():
+async def test_agent_operations(client):
     """Test agent management operations"""
-    prod_url = os.getenv("PRODUCTION_URL", "")
-    api_key = os.getenv("ZAI_API_KEY", "")
-    
-    if not prod_url or not api_key:
+    if not PROD_URL or not ZAI_API_KEY:
         print("ERROR: Set both PRODUCTION_URL and ZAI_API_KEY")
         return False
-    
+
     try:
         # Create a test agent
         test_agent_data = {
@@ -85,120 +100,132 @@ def test_agent_operations():
             "system_prompt": "You are a helpful coding assistant",
             "model": "glm-4.6"
         }
-        
+
         upload_start_time = time.time()
-        agent_response = requests.post(
-            f"{prod_url}/api/v1/agents/",
+        agent_response = await client.post(
+            f"{PROD_URL}/api/v1/agents/",
             json=test_agent_data,
             timeout=30
         )
         upload_time = time.time() - upload_start_time
-        
-        if agent_response.status_code == 200:
-            agent = agent_response.json()
-            agent_id = agent["id"]
-            print(f"✅ Agent created (ID: {agent_id})")
-            print(f"  Creation time: {upload_time:.2f}s")
-            
-            # Create a session
-            session_data = {
-                "title": "Production Test Session",
-                "agent_id": agent_id
-            }
-            
-            session_response = requests.post(
-                f"{prod_url}/api/v1/sessions/",
-                json=session_data,
-                timeout=10
-            )
-            
-            if session_response.status_code == 200:
-                print(f"✅ Session created: {session_response.json()['id']}")
-                session_id = session_response.json()["id"]
-                print(f"  Session time: {time.time():}")
-                
-                # Test file upload
-                test_content = "Production test content for production testing"
-    
-                files = {"file": ("prod_test.txt", test_content, "text/plain")}
-                
-                upload_response = requests.post(
-                    f"{prod_url}/api/v1/agents/{agent_id}/upload",
-                    files=files,
-                    timeout=30
-                )
-                
-                upload_time = time.time() - upload_start_time
-                
-                if upload_response.status_code == 200:
-                    uploadResult = upload_response.json()
-                    file_id = uploadResult['file_id']
-                    print(f"✅ File uploaded (ID: {file_id})")
-                    print(f"  Upload time: {upload_time:.2f}s")
-                else:
-                    print(f"❌ Upload failed: {upload_response.status_code}")
-                    return False
-                    
-            # Test chat functionality
+
+        if agent_response.status_code != 200:
+            print(f"❌ Agent creation failed: {agent_response.status_code}")
+            return False
+
+        agent = agent_response.json()
+        agent_id = agent["id"]
+        print(f"✅ Agent created (ID: {agent_id})")
+        print(f"  Creation time: {upload_time:.2f}s")
+
+        # Create a session
+        session_data = {
+            "title": "Production Test Session",
+            "agent_id": agent_id
+        }
+
+        session_response = await client.post(
+            f"{PROD_URL}/api/v1/sessions/",
+            json=session_data,
+            timeout=10
+        )
+
+        if session_response.status_code != 200:
+            print(f"❌ Session creation failed: {session_response.status_code}")
+            return False
+
+        session_id = session_response.json()["id"]
+        print(f"✅ Session created: {session_id}")
+
+        # Test file upload
+        test_content = "Production test content for production testing"
+
+        files = {"file": ("prod_test.txt", test_content, "text/plain")}
+
+        upload_response = await client.post(
+            f"{PROD_URL}/api/v1/agents/{agent_id}/upload",
+            files=files,
+            timeout=30
+        )
+
+        upload_time = time.time() - upload_start_time
+
+        if upload_response.status_code == 200:
+            uploadResult = upload_response.json()
+            file_id = uploadResult['file_id']
+            print(f"✅ File uploaded (ID: {file_id})")
+            print(f"  Upload time: {upload_time:.2f}s")
+        else:
+            print(f"❌ Upload failed: {upload_response.status_code}")
+            return False
+
+        # Test chat functionality
+        try:
             chat_start = time.time()
-            chat_response = requests.post(
-                f"{prod_url}/api/v1/chat/{session_id}/messages", timeout=30
+            chat_response = await client.post(
+                f"{PROD_URL}/api/v1/chat/{session_id}/messages",
+                json={"message": "What does the uploaded file say?"},
+                timeout=30
             )
             chat_time = time.time() - chat_start
-            
-            if chat_response.status_code == 200:
-                chat_result = chat_response.json()
-                content = chat_result.get("message", "")
-                
-                print(f"✅ Chat received")
-                print(f"  Response time: {chat_time:.2f}s")
-                print(f"  Content length: {len(content)} chars")
-                print(f"  Content: {content[:100]}...")
-                
-                if "Production test content" in content and "production" in content.lower():
-                    print("✅ Content access confirmed!")
-                    return True
-                
-                if chat_time > 10:
-                    print(f"⚠  Slow response time: {chat_time:.2f}s")
-                    
-                # Cleanup
-                delete_response = requests.delete(
-                    f"{prod_url}/api/v1/sessions/{session_id}", timeout=10
-                )
-                print(f"Session cleanup complete")
-                print(f"✅ Cleanup completed")
-            else:
-                return True
-            else:
+
+            if chat_response.status_code != 200:
                 print(f"❌ Chat failed: {chat_response.status_code}")
-                    return False
-                
+                return False
+
+            chat_result = chat_response.json()
+            content = chat_result.get("message", "")
+
+            print(f"✅ Chat received")
+            print(f"  Response time: {chat_time:.2f}s")
+            print(f"  Content length: {len(content)} chars")
+            print(f"  Content: {content[:100]}...")
+
+            if "Production test content" in content and "production" in content.lower():
+                print("✅ Content access confirmed!")
+                return True
+
+            if chat_time > 10:
+                print(f"⚠  Slow response time: {chat_time:.2f}s")
+
+            # Cleanup
+            await client.delete(
+                f"{PROD_URL}/api/v1/sessions/{session_id}", timeout=10
+            )
+            print(f"Session cleanup complete")
+            print(f"✅ Cleanup completed")
+            return True
+
         except Exception as e:
             print(f"❌ Chat test failed: {str(e)[:100]}")
             return False
-                
+
     except Exception as e:
         print(f"❌ Agent operations failed: {str(e)[:100]}")
         return False
-    
+
+async def run_api_tests():
+    """Run the API checks over one shared HTTP/2 client"""
+    async with httpx.AsyncClient(http2=True, timeout=2.0) as client:
+        return [
+            await test_basic_api(client),
+            await test_agent_operations(client)
+        ]
+
 def main():
     print("Production Test - Basic Validation")
     print("=" * 30)
-    
+
     # Test basic functionality
     success = all([
         check_health(),
-        test_basic_api(),
-        test_agent_operations()
+        *asyncio.run(run_api_tests())
     ])
-    
+
     print("\n" + "=" * 30)
     print(f"Basic Test Results:")
     print("✅ Ready for comprehensive testing" if success else "Not ready yet")
-    
-    return success
-    
+
     # Additional checks if all basic tests pass
     if success:
         print(f"\nNext Steps:")
@@ -206,7 +233,7 @@ def main():
         print("• Set CLEANUP=false to test without cleanup")
         print("• Monitor response times")
         print("• Test with larger content and files")
-        
+
         print(f"✅ Basic system operational: PRODUCTION READY")
     else:
         print(f"🚨️ Issues found - Check:")
@@ -215,7 +242,7 @@ def main():
         print(f"- Database connectivity")
         print("Review and fix issues before production use")
 
-if __name__main__':__main__main__() # Execute the main function
-    return True
-        
-    return True
+    return success
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -2,14 +2,14 @@
 """Simple test to check Railway PostgreSQL availability"""
 
 import os
-import psycopg2
+import psycopg
 
 def test_railway_postgres():
     """Test Railway PostgreSQL connection and setup"""
     print("🔍 Railway PostgreSQL Connection Test")
     print("=" * 50)
     
-   db_url = os.getenv("DATABASE_URL", "DATABASE_URL NOT SET")
+    db_url = os.getenv("DATABASE_URL", "DATABASE_URL NOT SET")
     
     if db_url == "DATABASE_URL NOT SET":
         print("❌ DATABASE_URL not set")
@@ -18,29 +18,37 @@ def test_railway_postgres():
     print(f"🔍 Testing PostgreSQL connection to: {db_url}")
     
     try:
-        conn = psycopg2.connect(db_url, connect_timeout=5)
+        conn = psycopg.connect(db_url, connect_timeout=5, autocommit=True)
+        cursor = conn.cursor()
         
-        version = conn.cursor().execute("SELECT version()")[0]
+        # Version and public table count in a single round-trip
+        cursor.execute("""
+            SELECT version(),
+                   (SELECT COUNT(*) FROM information_schema.tables WHERE table_schema='public')
+        """)
+        version, table_count = cursor.fetchone()
         print(f"✅ PostgreSQL Version: {version}")
         
         # Test basic schema existence
         try:
-            table_count = conn.cursor().execute("SELECT COUNT(*) FROM information_schema.tables WHERE table_schema='public'")
             print(f"✅ Found {table_count} tables in database")
             
             # Check for critical tables
             mcp_tables = ["mcp_servers", "chat_messages", "agents"]
             for table in mcp_tables:
                 try:
-                    table_exists = conn.cursor().execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] > 0
+                    cursor.execute(f"SELECT COUNT(*) FROM {table}")
+                    table_exists = cursor.fetchone()[0] > 0
                     print(f"✅ Table '{table}' exists with rows")
                 except:
                     print(f"⚠️ Table '{table}' missing")
+            cursor.close()
             conn.close()
             return table_count >= 5
             
         except Exception as e:
             print(f"❌ Schema check failed: {e}")
+            cursor.close()
             conn.close()
             return False
 
@@ -51,5 +59,5 @@ def test_railway_postgres():
         print(f"❌ Connection failed: {e}")
         return False
         
-if __name__main__main__main__main__main__main__main__main__main__":
+if __name__ == "__main__":
     exit_code = test_railway_postgres()
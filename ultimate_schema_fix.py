@@ -1,6 +1,6 @@
 
 import os
-import psycopg2
+import psycopg
 from urllib.parse import urlparse
 
 # Explicitly load .env
@@ -29,66 +29,54 @@ def force_fix_schema():
         print("❌ Critical: Could not find DATABASE_URL anywhere")
         return
 
-        try:
-            print(f"Connecting to: {db_url[:20]}...")
-            conn = psycopg2.connect(db_url)
-            conn.autocommit = True
-            cursor = conn.cursor()
-            
-            # 1. Add mcp_servers to agents
-            print("1. Checking 'mcp_servers' column in 'agents'...")
-            try:
-                cursor.execute("ALTER TABLE agents ADD COLUMN IF NOT EXISTS mcp_servers JSON;")
-                print("   - Success: 'mcp_servers' column ensure on 'agents'")
-            except Exception as e:
-                print(f"   - Failed: {e}")
-    
-            # 2. Add tools_used to chat_messages
-            print("2. Checking 'tools_used' column in 'chat_messages'...")
-            try:
-                cursor.execute("ALTER TABLE chat_messages ADD COLUMN IF NOT EXISTS tools_used JSON;")
-                print("   - Success: 'tools_used' column ensure on 'chat_messages'")
-            except Exception as e:
-                print(f"   - Failed: {e}")
-    
-            # 3. Add mcp_server_responses to chat_messages
-            print("3. Checking 'mcp_server_responses' column in 'chat_messages'...")
-            try:
-                cursor.execute("ALTER TABLE chat_messages ADD COLUMN IF NOT EXISTS mcp_server_responses JSON;")
-                print("   - Success: 'mcp_server_responses' column ensure on 'chat_messages'")
-            except Exception as e:
-                print(f"   - Failed: {e}")
-                
-            # 4. Ensure MCP tables exist (Basic check)
-            print("4. Checking 'mcp_servers' table...")
+    # All statements are idempotent; they are sent back-to-back in pipeline
+    # mode so the server handles them in a single round-trip instead of one
+    # per ALTER/CREATE.
+    schema_statements = [
+        # 1. Add mcp_servers to agents
+        "ALTER TABLE agents ADD COLUMN IF NOT EXISTS mcp_servers JSON;",
+        # 2. Add tools_used to chat_messages
+        "ALTER TABLE chat_messages ADD COLUMN IF NOT EXISTS tools_used JSON;",
+        # 3. Add mcp_server_responses to chat_messages
+        "ALTER TABLE chat_messages ADD COLUMN IF NOT EXISTS mcp_server_responses JSON;",
+        # 4. Ensure MCP tables exist (Basic check)
+        """
+        CREATE TABLE IF NOT EXISTS mcp_servers (
+            id VARCHAR(255) PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            description TEXT,
+            command VARCHAR(500) NOT NULL,
+            arguments JSON,
+            environment JSON,
+            working_directory VARCHAR(1000),
+            enabled BOOLEAN DEFAULT TRUE,
+            auto_start BOOLEAN DEFAULT TRUE,
+            health_check_interval INTEGER DEFAULT 30,
+            status VARCHAR(20) DEFAULT 'stopped',
+            process_id INTEGER,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+        );
+        """,
+    ]
+
+    try:
+        print(f"Connecting to: {db_url[:20]}...")
+        with psycopg.connect(db_url, autocommit=True) as conn:
+            print("Ensuring 'mcp_servers' on 'agents', 'tools_used' and "
+                  "'mcp_server_responses' on 'chat_messages', and the 'mcp_servers' table...")
             try:
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS mcp_servers (
-                        id VARCHAR(255) PRIMARY KEY,
-                        name VARCHAR(255) NOT NULL,
-                        description TEXT,
-                        command VARCHAR(500) NOT NULL,
-                        arguments JSON,
-                        environment JSON,
-                        working_directory VARCHAR(1000),
-                        enabled BOOLEAN DEFAULT TRUE,
-                        auto_start BOOLEAN DEFAULT TRUE,
-                        health_check_interval INTEGER DEFAULT 30,
-                        status VARCHAR(20) DEFAULT 'stopped',
-                        process_id INTEGER,
-                        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-                    );
-                """)
-                print("   - Success: 'mcp_servers' table ensured")
-            except Exception as e:
+                with conn.pipeline(), conn.cursor() as cursor:
+                    for statement in schema_statements:
+                        cursor.execute(statement)
+                print("   - Success: all columns and tables ensured")
+            except psycopg.Error as e:
                 print(f"   - Failed: {e}")
-    
-            conn.close()
-            print("\nFIX COMPLETE. Restart the application to verify.")
-    
-        except Exception as e:
-            print(f"\nCRITICAL CONNECTION ERROR: {e}")
+
+        print("\nFIX COMPLETE. Restart the application to verify.")
+
+    except Exception as e:
+        print(f"\nCRITICAL CONNECTION ERROR: {e}")
 
 if __name__ == "__main__":
     force_fix_schema()
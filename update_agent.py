@@ -21,7 +21,9 @@ payload = {
 
 try:
     print(f"Updating Agent {agent_id}...")
-    resp = httpx.put(url, json=payload)
+    # Keep updates inside one client so batch edits reuse the same TLS session
+    with httpx.Client(http2=True, timeout=30.0) as client:
+        resp = client.put(url, json=payload)
     if resp.status_code == 200:
         print("Success! Agent updated.")
         print(json.dumps(resp.json(), indent=2))
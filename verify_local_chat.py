@@ -1,24 +1,38 @@
 import os
 import sys
+import asyncio
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import AsyncOpenAI
 
 load_dotenv()
 
-try:
-    client = OpenAI(
-        api_key=os.getenv("ZAI_API_KEY"),
-        base_url="https://api.z.ai/api/coding/paas/v4"
-    )
-    
+# Shared client so importers reuse one connection pool
+client = AsyncOpenAI(
+    api_key=os.getenv("ZAI_API_KEY"),
+    base_url="https://api.z.ai/api/coding/paas/v4"
+)
+
+async def run():
     print(f"Client created successfully. OpenAI version: {sys.modules['openai'].__version__}")
-    
-    response = client.chat.completions.create(
+
+    stream = await client.chat.completions.create(
         model="glm-4.5",
         messages=[{"role": "user", "content": "Hello"}],
-        max_tokens=10
+        max_tokens=10,
+        stream=True
     )
-    print("Chat success:", response.choices[0].message.content or response.choices[0].message.reasoning_content)
-    
-except Exception as e:
-    print(f"Local Test Failed: {e}")
+    sys.stdout.write("Chat success: ")
+    async for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+        # glm-4.5 may spend a short budget entirely on reasoning tokens
+        sys.stdout.write(delta.content or getattr(delta, "reasoning_content", None) or "")
+        sys.stdout.flush()
+    sys.stdout.write("\n")
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(run())
+    except Exception as e:
+        print(f"Local Test Failed: {e}")
@@ -2,18 +2,45 @@ import requests
 import sys
 import time
 import json
-from datetime import datetime
+from datetime import datetime, timezone
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 PROD_URL = "https://zlm-chatbot-production.up.railway.app"
 HEALTH_ENDPOINT = f"{PROD_URL}/api/v1/ui/health"
 
+# Shared session so repeated checks reuse the pooled TLS connection
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=1,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(502, 503, 504))
+))
+
+# Repeated checks within this window reuse the last healthy response
+HEALTH_TTL_NS = 5 * 1_000_000_000
+_last_health = None  # (monotonic_ns, response)
+
+def _get_health():
+    """GET the health endpoint, reusing a 200 response fetched moments ago"""
+    global _last_health
+    now_ns = time.monotonic_ns()
+    if _last_health and now_ns - _last_health[0] < HEALTH_TTL_NS:
+        return _last_health[1]
+    response = _SESSION.get(HEALTH_ENDPOINT, timeout=10)
+    # Failures are never reused, so a retry always reaches the server
+    _last_health = (now_ns, response) if response.status_code == 200 else None
+    return response
+
 def check_status():
-    print(f"[{datetime.now().isoformat()}] Checking production status...")
+    print(f"[{datetime.now(timezone.utc).isoformat()}] Checking production status...")
     print(f"Target: {HEALTH_ENDPOINT}")
     
     try:
-        response = requests.get(HEALTH_ENDPOINT, timeout=10)
-        print(f"HTTP Status: {response.status_code}")
+        started_ns = time.monotonic_ns()
+        response = _get_health()
+        elapsed_ms = (time.monotonic_ns() - started_ns) // 1_000_000
+        print(f"HTTP Status: {response.status_code} ({elapsed_ms} ms)")
         
         if response.status_code == 200:
             data = response.json()
@@ -1,73 +1,14 @@
-import os
-import sys
-from dotenv import load_dotenv
-from openai import OpenAI
+from zai_common import make_client, require_api_key, run_chatbot
 
-# Load environment variables
-load_dotenv()
-
-# Initialize the OpenAI client with Z.ai's coding endpoint
-client = OpenAI(
-    api_key=os.getenv("ZAI_API_KEY"),
-    base_url="https://api.z.ai/api/coding/paas/v4"
-)
+# Shared client for the coding endpoint
+client = make_client()
 
 def chat_with_zai_coding():
     """Interactive chat with Z.ai's GLM model using coding endpoint"""
-    print("Z.ai Coding Chatbot - GLM-4.6")
-    print("Using coding endpoint with unlimited access")
-    print("Type 'quit' or 'exit' to end the conversation\n")
-    
-    # Initialize conversation history
-    messages = [
-        {
-            "role": "system",
-            "content": "You are a helpful AI assistant powered by Z.ai's GLM-4.6 model. Be concise and helpful."
-        }
-    ]
-    
-    while True:
-        # Get user input
-        user_input = input("You: ").strip()
-        
-        # Check for exit commands
-        if user_input.lower() in ['quit', 'exit']:
-            print("Goodbye!")
-            break
-        
-        # Skip empty input
-        if not user_input:
-            continue
-            
-        # Add user message to conversation
-        messages.append({"role": "user", "content": user_input})
-        
-        try:
-            # Create chat completion with Z.ai coding endpoint
-            response = client.chat.completions.create(
-                model="glm-4.6",  # Using the GLM-4.6 model
-                messages=messages,
-                temperature=0.7,
-                max_tokens=1000,
-                stream=False
-            )
-            
-            # Get the assistant's response
-            message = response.choices[0].message
-            
-            # Check for reasoning content first (coding endpoint special feature)
-            if message.reasoning_content:
-                print(f"Assistant: {message.reasoning_content}")
-                messages.append({"role": "assistant", "content": message.reasoning_content})
-            elif message.content:
-                print(f"Assistant: {message.content}")
-                messages.append({"role": "assistant", "content": message.content})
-            else:
-                print("Assistant: [No response available]")
-            
-        except Exception as e:
-            print(f"Error: {str(e)}")
-            print("Please check your API key and connection.")
+    run_chatbot(
+        title="Z.ai Coding Chatbot - GLM-4.6",
+        subtitle="Using coding endpoint with unlimited access"
+    )
 
 def test_zai_coding_connection():
     """Test basic connection to Z.ai coding API"""
@@ -134,11 +75,7 @@ def test_streaming_coding():
 
 if __name__ == "__main__":
     # Check if API key is set
-    if not os.getenv("ZAI_API_KEY"):
-        print("Error: ZAI_API_KEY not found in environment variables.")
-        print("Please create a .env file with your Z.ai API key:")
-        print("ZAI_API_KEY=your_api_key_here")
-        sys.exit(1)
+    require_api_key()
     
     # Test connection first
     if test_zai_coding_connection():
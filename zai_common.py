@@ -0,0 +1,143 @@
+import os
+import re
+import sys
+import functools
+from dotenv import load_dotenv
+from openai import OpenAI
+
+# Load environment variables
+load_dotenv()
+
+# Coding endpoint (unlimited access on the coding plan)
+ZAI_CODING_URL = "https://api.z.ai/api/coding/paas/v4"
+
+# Turns of history (user + assistant pairs) kept besides the system prompt;
+# at least the current turn is always kept
+MAX_HISTORY_TURNS = max(1, int(os.getenv("ZAI_MAX_HISTORY_TURNS", "10")))
+
+# Markers that a reasoning line carries the actual answer
+_ANSWER_RE = re.compile(r'answer:|result:|therefore|\bso\b|the answer', re.I)
+# Reasoning lines with these prefixes are scratch-work steps, not the answer
+_LIST_PREFIXES = ('1.', '2.', '3.', '4.', '5.', '*', '-', '#')
+# Non-empty lines, matched in place instead of splitting the whole payload
+_LINE_RE = re.compile(r'[^\n]+')
+
+@functools.lru_cache(maxsize=None)
+def make_client(base_url=ZAI_CODING_URL):
+    """Return the shared OpenAI client for a Z.ai endpoint"""
+    return OpenAI(
+        api_key=os.getenv("ZAI_API_KEY"),
+        base_url=base_url
+    )
+
+def require_api_key():
+    """Exit with setup instructions when ZAI_API_KEY is missing"""
+    if not os.getenv("ZAI_API_KEY"):
+        print("Error: ZAI_API_KEY not found in environment variables.")
+        print("Please create a .env file with your Z.ai API key:")
+        print("ZAI_API_KEY=your_api_key_here")
+        sys.exit(1)
+
+def trim_history(messages):
+    """Keep the system prompt plus the most recent MAX_HISTORY_TURNS user turns"""
+    # Cut only at user messages so a turn is never split from its reply
+    # (or from its tool results), even after a turn that got no reply
+    user_turns = [i for i, message in enumerate(messages) if message["role"] == "user"]
+    if len(user_turns) > MAX_HISTORY_TURNS:
+        del messages[1:user_turns[-MAX_HISTORY_TURNS]]
+
+def extract_answer(reasoning):
+    """Pull the answer lines out of reasoning content, or return a short preview"""
+    answer_lines = []
+    found_answer = False
+
+    for match in _LINE_RE.finditer(reasoning):
+        line = match.group().strip()
+        if line and not line.startswith(_LIST_PREFIXES):
+            # Look for direct answer
+            if _ANSWER_RE.search(line):
+                found_answer = True
+            if found_answer or len(line) < 100:
+                answer_lines.append(line)
+
+    if answer_lines:
+        return ' '.join(answer_lines).strip()
+    # Fallback to reasoning content (shortened)
+    return reasoning[:200] + "..." if len(reasoning) > 200 else reasoning
+
+def run_chatbot(*, title, base_url=ZAI_CODING_URL, model="glm-4.6", subtitle=None, extract_reasoning=False):
+    """Interactive streaming chat loop shared by the Z.ai chatbot scripts"""
+    client = make_client(base_url)
+
+    print(title)
+    if subtitle:
+        print(subtitle)
+    print("Type 'quit' or 'exit' to end the conversation\n")
+
+    # Initialize conversation history
+    messages = [
+        {
+            "role": "system",
+            "content": "You are a helpful AI assistant powered by Z.ai's GLM-4.6 model. Be concise and helpful."
+        }
+    ]
+
+    while True:
+        # Get user input
+        user_input = input("You: ").strip()
+
+        # Check for exit commands
+        if user_input.lower() in ['quit', 'exit']:
+            print("Goodbye!")
+            break
+
+        # Skip empty input
+        if not user_input:
+            continue
+
+        # Add user message to conversation
+        messages.append({"role": "user", "content": user_input})
+
+        try:
+            # Stream the chat completion so the reply prints as it is generated
+            stream = client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=0.7,
+                max_tokens=1000,
+                stream=True
+            )
+
+            content_parts = []
+            reasoning_parts = []
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                if delta.content:
+                    if not content_parts:
+                        print("Assistant: ", end="", flush=True)
+                    content_parts.append(delta.content)
+                    print(delta.content, end="", flush=True)
+                # Coding endpoint special feature: reasoning arrives on its own channel
+                elif getattr(delta, 'reasoning_content', None):
+                    reasoning_parts.append(delta.reasoning_content)
+
+            if content_parts:
+                print()
+                messages.append({"role": "assistant", "content": "".join(content_parts)})
+            elif reasoning_parts:
+                reasoning = "".join(reasoning_parts)
+                shown = extract_answer(reasoning) if extract_reasoning else reasoning
+                print(f"Assistant: {shown}")
+                messages.append({"role": "assistant", "content": reasoning})
+            else:
+                print("Assistant: [No response available]")
+
+            # Keep the system prompt plus the most recent turns so each
+            # request re-sends a bounded amount of history
+            trim_history(messages)
+
+        except Exception as e:
+            print(f"Error: {str(e)}")
+            print("Please check your API key and connection.")
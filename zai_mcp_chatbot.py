@@ -5,53 +5,221 @@ Integrates Z.ai API with File System MCP Server
 """
 
 import os
+import re
 import sys
-import json
 import asyncio
-import subprocess
-from typing import Dict, List, Any
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Tuple, Any
+import orjson
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import AsyncOpenAI
+from zai_common import trim_history
 
 # Load environment variables
 load_dotenv()
 
+# Longest JSON-RPC line accepted from the MCP server (read_file can return whole files)
+MCP_FRAME_LIMIT = 16 * 1024 * 1024
+# Seconds to wait for the MCP server to answer a tool call
+MCP_CALL_TIMEOUT = 30
+
+# Constant head of every tools/call frame; only id and params vary
+_TOOL_CALL_PREFIX = b'{"jsonrpc":"2.0","method":"tools/call","id":'
+
+def _tool_call_frame(request_id: int, tool_name: str, arguments: Dict[str, Any]) -> bytes:
+    """Serialize a newline-terminated tools/call request around the prebuilt prefix"""
+    return b"".join((
+        _TOOL_CALL_PREFIX,
+        str(request_id).encode(),
+        b',"params":',
+        orjson.dumps({"name": tool_name, "arguments": arguments}),
+        b"}\n"
+    ))
+
+# Token budgets. The planner runs with thinking disabled, so reasoning
+# tokens do not eat into its cap and it only has room to choose tools
+PLANNER_MAX_TOKENS = 256
+ANSWER_MAX_TOKENS = 1000
+# Z.ai request option that turns off the planner's reasoning phase
+PLANNER_EXTRA_BODY = {"thinking": {"type": "disabled"}}
+
+# Seconds a repeated question is answered from the response cache
+RESPONSE_CACHE_TTL = float(os.getenv("ZAI_MCP_CACHE_TTL", "300"))
+# Most answers kept; the least recently used one is dropped first
+RESPONSE_CACHE_SIZE = 128
+# Put this anywhere in a message to skip the response cache
+NOCACHE_MARKER = "#nocache"
+
+# Slash commands answered by calling an MCP tool directly, skipping the
+# model. The prefix keeps ordinary prompts such as "read this" going to
+# the model. Named groups become the tool arguments.
+DIRECT_COMMANDS = (
+    (re.compile(r"/ls", re.I), "list_files"),
+    (re.compile(r"/read (?P<path>\S+)", re.I), "read_file"),
+    (re.compile(r"/analyze (?P<file_path>\S+\.py)", re.I), "analyze_file_structure"),
+    (re.compile(r"/search (?P<pattern>.+)", re.I), "search_code"),
+)
+
+# Bytes read from stdin past the end of the last line returned
+_stdin_pending = bytearray()
+
+def _read_stdin_line() -> str:
+    """Block until a whole line is available on stdin and return it"""
+    # os.read on the descriptor takes no lock on sys.stdin's buffer, so a
+    # thread left blocked here cannot break interpreter shutdown the way a
+    # thread blocked in input() does
+    fd = sys.stdin.fileno()
+    while b"\n" not in _stdin_pending:
+        chunk = os.read(fd, 4096)
+        if not chunk:
+            if not _stdin_pending:
+                raise EOFError
+            break
+        _stdin_pending.extend(chunk)
+    line, _, rest = bytes(_stdin_pending).partition(b"\n")
+    _stdin_pending[:] = rest
+    return line.decode(sys.stdin.encoding or "utf-8", errors="replace").rstrip("\r")
+
+def _read_input(prompt: str) -> asyncio.Future:
+    """Read a line from stdin on a daemon thread without blocking the event loop"""
+    # A daemon thread rather than asyncio.to_thread: the default executor is
+    # joined on shutdown, so Ctrl+C would hang until Enter is pressed
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+    
+    def settle(method, value):
+        if not future.done():
+            method(value)
+    
+    def worker():
+        try:
+            line = _read_stdin_line()
+        except Exception as e:
+            loop.call_soon_threadsafe(settle, future.set_exception, e)
+        else:
+            loop.call_soon_threadsafe(settle, future.set_result, line)
+    
+    threading.Thread(target=worker, daemon=True).start()
+    return future
+
 class MCPEnabledZAIChatbot:
     """Z.ai Chatbot with MCP Server Integration"""
     
     def __init__(self):
-        self.client = OpenAI(
+        self.client = AsyncOpenAI(
             api_key=os.getenv("ZAI_API_KEY"),
             base_url="https://api.z.ai/api/coding/paas/v4"
         )
+        # A lighter model picks the tools; the full model writes the answer
+        self.planner_model = os.getenv("ZAI_PLANNER_MODEL", "glm-4.5-air")
+        self.synth_model = os.getenv("ZAI_SYNTH_MODEL", "glm-4.6")
         self.mcp_process = None
+        self.server_name = None
+        self._read_frame = None
+        # Request ids 1 and 2 are used by the handshake
+        self._next_id = itertools.count(3)
+        # Tool calls waiting for a response, by request id
+        self._pending = {}
+        self._reader_task = None
+        self._warmup_task = None
+        # normalized opening question -> (expires_at, response); only turns
+        # that made no tool calls are stored, as those read no workspace
+        # files. Kept in least-recently-used order
+        self._response_cache = OrderedDict()
+        # Whether the last model turn called any MCP tools
+        self._turn_used_tools = False
         self.connected_tools = []
+        # Built once from the discovered tools; see _cache_tool_prompt
+        self._openai_tools = []
+        self._system_prompt = ""
+        self._tool_names = frozenset()
+        # Conversation so far, always starting with the system prompt
+        self._history = []
         
     async def start_mcp_server(self):
         """Start the MCP file server"""
         try:
             print("Starting MCP File Server...")
             
-            # Start MCP server as subprocess
-            cmd = [sys.executable, "mcp_file_server.py"]
-            self.mcp_process = subprocess.Popen(
-                cmd,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=0
+            # Open the Z.ai connection while the server boots so the first
+            # question does not also pay for DNS and the TLS handshake
+            self._warmup_task = asyncio.create_task(self._warm_up_client())
+            
+            # Start MCP server as an asyncio subprocess so pipe I/O never
+            # blocks the event loop
+            self.mcp_process = await asyncio.create_subprocess_exec(
+                sys.executable, "mcp_file_server.py",
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                limit=MCP_FRAME_LIMIT
             )
+            self._read_frame = self.mcp_process.stdout.readline
             
             # Initialize MCP connection
             await self.initialize_mcp_connection()
-            print("PASS: MCP Server started successfully")
+            
+            # From here on one task owns stdout and routes responses by id
+            self._reader_task = asyncio.create_task(self._reader_loop())
+            
+            # Report the whole handshake in one write
+            lines = []
+            if self.server_name is not None:
+                lines.append(f"MCP Connected: {self.server_name}")
+            lines.append(f"Discovered {len(self.connected_tools)} MCP tools:")
+            lines.extend(f"  - {tool['name']}: {tool['description']}" for tool in self.connected_tools)
+            lines.append("PASS: MCP Server started successfully")
+            sys.stdout.write("\n".join(lines) + "\n")
             return True
             
         except Exception as e:
             print(f"Failed to start MCP server: {e}")
             return False
     
+    async def _warm_up_client(self):
+        """Establish a pooled HTTPS connection to the Z.ai API"""
+        try:
+            await self.client.models.list()
+        except Exception:
+            # Only the connection matters; the response itself is unused
+            pass
+    
+    async def _send_frame(self, msg: Dict[str, Any]):
+        """Write one JSON-RPC frame with a single write and drain"""
+        # orjson appends the newline itself, so the frame is never re-copied
+        self.mcp_process.stdin.write(orjson.dumps(msg, option=orjson.OPT_APPEND_NEWLINE))
+        await self.mcp_process.stdin.drain()
+    
+    async def _reader_loop(self):
+        """Resolve the pending tool call matching each response line"""
+        try:
+            while True:
+                line = await self._read_frame()
+                if not line:
+                    break
+                try:
+                    response_data = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    continue
+                # Only JSON-RPC objects can answer a call; skip stray values
+                if not isinstance(response_data, dict):
+                    continue
+                # Notifications carry no id and have no waiter
+                future = self._pending.pop(response_data.get("id"), None)
+                if future and not future.done():
+                    future.set_result(response_data)
+        finally:
+            # Server went away: fail every call still waiting on it
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("MCP server closed the connection"))
+            self._pending.clear()
+    
     async def initialize_mcp_connection(self):
         """Initialize MCP connection and discover tools"""
         # Send initialization message
@@ -73,14 +241,13 @@ class MCPEnabledZAIChatbot:
         
         # Send to MCP server
         if self.mcp_process and self.mcp_process.stdin:
-            self.mcp_process.stdin.write(json.dumps(init_msg) + "\n")
-            self.mcp_process.stdin.flush()
+            await self._send_frame(init_msg)
             
             # Read response
-            response = self.mcp_process.stdout.readline()
+            response = await self._read_frame()
             if response:
-                response_data = json.loads(response.strip())
-                print(f"MCP Connected: {response_data.get('result', {}).get('serverInfo', {}).get('name', 'Unknown')}")
+                response_data = orjson.loads(response)
+                self.server_name = response_data.get('result', {}).get('serverInfo', {}).get('name', 'Unknown')
             
             # Discover available tools
             tools_msg = {
@@ -90,59 +257,20 @@ class MCPEnabledZAIChatbot:
                 "params": {}
             }
             
-            self.mcp_process.stdin.write(json.dumps(tools_msg) + "\n")
-            self.mcp_process.stdin.flush()
+            await self._send_frame(tools_msg)
             
-            tools_response = self.mcp_process.stdout.readline()
+            tools_response = await self._read_frame()
             if tools_response:
-                tools_data = json.loads(tools_response.strip())
+                tools_data = orjson.loads(tools_response)
                 self.connected_tools = tools_data.get('result', {}).get('tools', [])
-                print(f"Discovered {len(self.connected_tools)} MCP tools:")
-                for tool in self.connected_tools:
-                    print(f"  - {tool['name']}: {tool['description']}")
-    
-    async def call_mcp_tool(self, tool_name: str, arguments: Dict[str, Any]) -> str:
-        """Call an MCP server tool"""
-        try:
-            tool_msg = {
-                "jsonrpc": "2.0",
-                "id": 3,
-                "method": "tools/call",
-                "params": {
-                    "name": tool_name,
-                    "arguments": arguments
-                }
-            }
-            
-            if self.mcp_process and self.mcp_process.stdin:
-                self.mcp_process.stdin.write(json.dumps(tool_msg) + "\n")
-                self.mcp_process.stdin.flush()
-                
-                # Read response
-                response = self.mcp_process.stdout.readline()
-                if response:
-                    response_data = json.loads(response.strip())
-                    
-                    if 'error' in response_data:
-                        return f"Error: {response_data['error']}"
-                    
-                    result = response_data.get('result', {})
-                    if 'content' in result:
-                        content_list = result['content']
-                        if content_list:
-                            return content_list[0].get('text', 'No content returned')
-                
-                return "Tool call failed - no response received"
-            
-        except Exception as e:
-            return f"Error calling tool {tool_name}: {str(e)}"
-    
-    def create_openai_tools(self) -> List[Dict[str, Any]]:
-        """Convert MCP tools to OpenAI function format"""
-        openai_tools = []
         
-        for tool in self.connected_tools:
-            openai_tool = {
+        self._cache_tool_prompt()
+    
+    def _cache_tool_prompt(self):
+        """Build the OpenAI tool schema and system prompt once per connection"""
+        self._tool_names = frozenset(tool["name"] for tool in self.connected_tools)
+        self._openai_tools = [
+            {
                 "type": "function",
                 "function": {
                     "name": tool["name"],
@@ -150,101 +278,323 @@ class MCPEnabledZAIChatbot:
                     "parameters": tool["inputSchema"]
                 }
             }
-            openai_tools.append(openai_tool)
+            for tool in self.connected_tools
+        ]
         
-        return openai_tools
-    
-    async def chat_with_mcp(self, user_message: str) -> str:
-        """Chat with Z.ai using MCP tools"""
-        try:
-            # Setup conversation
-            messages = [
-                {
-                    "role": "system",
-                    "content": f"""You are a helpful AI assistant with access to file system tools. 
+        tool_lines = "\n".join(f"- {tool['name']}: {tool['description']}" for tool in self.connected_tools)
+        self._system_prompt = f"""You are a helpful AI assistant with access to file system tools. 
 You can help users analyze code, read files, and explore the project structure.
 
 Available MCP tools:
-{chr(10).join(f"- {tool['name']}: {tool['description']}" for tool in self.connected_tools)}
+{tool_lines}
 
 When users ask you to analyze files, read code, or explore the project, use the available tools to provide accurate information."""
-                },
-                {
-                    "role": "user",
-                    "content": user_message
-                }
-            ]
-            
-            # Get OpenAI tools from MCP
-            openai_tools = self.create_openai_tools()
-            
-            # Call Z.ai API with tools
-            response = self.client.chat.completions.create(
-                model="glm-4.6",
+        self._history = [{"role": "system", "content": self._system_prompt}]
+    
+    def _record_turn(self, user_message: str, reply: str):
+        """Add a turn answered without the model so follow-ups can refer to it"""
+        self._history.append({"role": "user", "content": user_message})
+        self._history.append({"role": "assistant", "content": reply})
+        self._trim_history()
+    
+    def _trim_history(self):
+        """Keep the system prompt plus the most recent user turns"""
+        trim_history(self._history)
+    
+    async def call_mcp_tool(self, tool_name: str, arguments: Dict[str, Any]) -> str:
+        """Call an MCP server tool"""
+        return (await self.call_mcp_tools_batch([(tool_name, arguments)]))[0]
+    
+    async def call_mcp_tools_batch(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[str]:
+        """Call several MCP server tools with one pipe write; results keep call order"""
+        # Without the reader task nothing would ever resolve the calls
+        if not self._reader_task or self._reader_task.done():
+            return ["Tool call failed - MCP server is not running"] * len(calls)
+        
+        loop = asyncio.get_running_loop()
+        request_ids = []
+        futures = []
+        frames = []
+        for tool_name, arguments in calls:
+            request_id = next(self._next_id)
+            # Register before writing so a fast reply cannot be missed
+            future = loop.create_future()
+            self._pending[request_id] = future
+            request_ids.append(request_id)
+            futures.append(future)
+            frames.append(_tool_call_frame(request_id, tool_name, arguments))
+        
+        try:
+            self.mcp_process.stdin.writelines(frames)
+            await self.mcp_process.stdin.drain()
+            responses = await asyncio.gather(
+                *(asyncio.wait_for(future, timeout=MCP_CALL_TIMEOUT) for future in futures),
+                return_exceptions=True
+            )
+        except Exception as e:
+            responses = [e] * len(calls)
+        finally:
+            for request_id in request_ids:
+                self._pending.pop(request_id, None)
+        
+        return [
+            self._format_tool_response(tool_name, response_data)
+            for (tool_name, _), response_data in zip(calls, responses)
+        ]
+    
+    def _format_tool_response(self, tool_name: str, response_data) -> str:
+        """Turn a tools/call response (or the exception it failed with) into text"""
+        if isinstance(response_data, Exception):
+            return f"Error calling tool {tool_name}: {str(response_data)}"
+        
+        if 'error' in response_data:
+            return f"Error: {response_data['error']}"
+        
+        result = response_data.get('result', {})
+        if 'content' in result:
+            content_list = result['content']
+            if content_list:
+                return content_list[0].get('text', 'No content returned')
+        
+        return "Tool call failed - no response received"
+    
+    def create_openai_tools(self) -> List[Dict[str, Any]]:
+        """Return the MCP tools in OpenAI function format"""
+        return self._openai_tools
+    
+    async def _try_direct(self, user_message: str):
+        """Run a recognised command straight through its MCP tool, or return None"""
+        text = user_message.strip()
+        if text.lower() == "/help":
+            commands = ", ".join(sorted(self._tool_names)) or "none"
+            return ("Ask anything about the project, or use a direct command: "
+                    "'/ls', '/read <path>', '/analyze <file>.py', '/search <text>'.\n"
+                    f"Available MCP tools: {commands}")
+        
+        for pattern, tool_name in DIRECT_COMMANDS:
+            match = pattern.fullmatch(text)
+            if match and tool_name in self._tool_names:
+                return await self.call_mcp_tool(tool_name, match.groupdict())
+        return None
+    
+    def _cache_key(self, user_message: str):
+        """Key an opening question by its whitespace/case-normalized text,
+        or return None once the conversation has earlier turns"""
+        # A follow-up such as "explain more" depends on everything before
+        # it, so only questions asked with no prior context can repeat
+        if len(self._history) > 1:
+            return None
+        return " ".join(user_message.lower().split())
+    
+    def reset_conversation(self):
+        """Start a new conversation that keeps only the system prompt"""
+        del self._history[1:]
+    
+    def _cache_lookup(self, key):
+        """Return an unexpired cached answer, or None"""
+        cached = self._response_cache.get(key)
+        if cached is None:
+            return None
+        if cached[0] <= time.monotonic():
+            del self._response_cache[key]
+            return None
+        self._response_cache.move_to_end(key)
+        return cached[1]
+    
+    def _cache_store(self, key, response: str):
+        """Cache an answer, evicting expired entries and then the least recently used"""
+        cache = self._response_cache
+        now = time.monotonic()
+        for stale in [k for k, (expires_at, _) in cache.items() if expires_at <= now]:
+            del cache[stale]
+        cache[key] = (now + RESPONSE_CACHE_TTL, response)
+        cache.move_to_end(key)
+        while len(cache) > RESPONSE_CACHE_SIZE:
+            cache.popitem(last=False)
+    
+    async def chat_with_mcp(self, user_message: str) -> str:
+        """Chat with Z.ai using MCP tools and return the whole reply"""
+        return "".join([piece async for piece in self.chat_with_mcp_stream(user_message)])
+    
+    async def chat_with_mcp_stream(self, user_message: str):
+        """Yield the reply as it is generated, reusing recent answers to repeated questions"""
+        # Direct commands are cheap local tool calls, so they are never cached
+        direct = await self._try_direct(user_message)
+        if direct is not None:
+            self._record_turn(user_message, direct)
+            yield direct
+            return
+        
+        key = None
+        if NOCACHE_MARKER in user_message:
+            user_message = user_message.replace(NOCACHE_MARKER, "").strip()
+        else:
+            key = self._cache_key(user_message)
+        if key is not None:
+            cached = self._cache_lookup(key)
+            if cached is not None:
+                self._record_turn(user_message, cached)
+                yield cached
+                return
+        
+        parts = []
+        try:
+            async for piece in self._chat_uncached(user_message):
+                parts.append(piece)
+                yield piece
+        except Exception as e:
+            yield f"Error in chat: {str(e)}"
+            return
+        
+        # Answers built from tool results go stale as soon as a file changes
+        if key is not None and not self._turn_used_tools:
+            self._cache_store(key, "".join(parts))
+    
+    def _parse_tool_calls(self, message):
+        """Return [(tool_call, arguments)] and whether every call was well formed"""
+        parsed = []
+        well_formed = True
+        for tool_call in getattr(message, "tool_calls", None) or ():
+            function = tool_call.function
+            try:
+                arguments = orjson.loads(function.arguments)
+            except orjson.JSONDecodeError:
+                arguments = {}
+                well_formed = False
+            if function.name not in self._tool_names:
+                well_formed = False
+            parsed.append((tool_call, arguments))
+        return parsed, well_formed
+    
+    async def _plan(self, messages):
+        """Ask the planner model for tool calls, escalating to the synthesis model
+        when the planner is cut off mid-call or emits a malformed call.
+        Returns the message, its parsed tool calls and the model that wrote it"""
+        attempts = [
+            (self.planner_model, PLANNER_MAX_TOKENS, PLANNER_EXTRA_BODY),
+            (self.synth_model, ANSWER_MAX_TOKENS, None)
+        ]
+        if self.planner_model == self.synth_model:
+            attempts = attempts[1:]
+        
+        for model, max_tokens, extra_body in attempts:
+            response = await self.client.chat.completions.create(
+                model=model,
                 messages=messages,
-                tools=openai_tools,
+                tools=self._openai_tools,
                 tool_choice="auto",
                 temperature=0.7,
-                max_tokens=1000
+                max_tokens=max_tokens,
+                extra_body=extra_body
             )
+            choice = response.choices[0]
+            tool_calls, well_formed = self._parse_tool_calls(choice.message)
+            # Running out of tokens before any tool call means the planner
+            # started answering instead; the synthesis model writes that
+            if well_formed and (choice.finish_reason != "length" or not tool_calls):
+                break
+        return choice.message, tool_calls, model
+    
+    async def _stream_answer(self, messages):
+        """Stream the synthesis model's answer (no tool schema: it needs no more tools)"""
+        stream = await self.client.chat.completions.create(
+            model=self.synth_model,
+            messages=messages,
+            temperature=0.7,
+            max_tokens=ANSWER_MAX_TOKENS,
+            stream=True
+        )
+        async for chunk in stream:
+            content = chunk.choices[0].delta.content if chunk.choices else None
+            if content:
+                yield content
+    
+    async def _chat_uncached(self, user_message: str):
+        """Chat with Z.ai using MCP tools, streaming the final answer"""
+        # Every turn extends the same history, so earlier turns stay in
+        # context and the request prefix stays stable for prompt caching
+        history = self._history
+        turn_start = len(history)
+        history.append({"role": "user", "content": user_message})
+        
+        try:
+            # Call Z.ai API with tools
+            message, tool_calls, planned_by = await self._plan(history)
+            self._turn_used_tools = bool(tool_calls)
             
-            message = response.choices[0].message
-            
-            # Check if model wants to call tools
-            if hasattr(message, 'tool_calls') and message.tool_calls:
-                # Execute tool calls through MCP
-                tool_results = []
-                
-                for tool_call in message.tool_calls:
-                    tool_name = tool_call.function.name
-                    try:
-                        arguments = json.loads(tool_call.function.arguments)
-                    except:
-                        arguments = {}
-                    
-                    # Call MCP tool
-                    result = await self.call_mcp_tool(tool_name, arguments)
-                    tool_results.append({
-                        "tool_call_id": tool_call.id,
-                        "role": "tool",
-                        "content": result
-                    })
+            # The synthesis model already answered while planning
+            if not tool_calls and planned_by == self.synth_model:
+                reply = message.content or ""
+                yield reply or "No response available"
+            else:
+                # Check if model wants to call tools
+                if tool_calls:
+                    # Independent tool calls from one turn go out in one batch
+                    results = await self.call_mcp_tools_batch([
+                        (tool_call.function.name, arguments) for tool_call, arguments in tool_calls
+                    ])
                 
-                # Add tool results to conversation
-                messages.append(message)  # Assistant's tool call request
-                messages.extend(tool_results)  # Tool results
+                    tool_results = []
+                    for (tool_call, _), result in zip(tool_calls, results):
+                        tool_results.append({
+                            "tool_call_id": tool_call.id,
+                            "role": "tool",
+                            "content": result
+                        })
                 
-                # Get final response
-                final_response = self.client.chat.completions.create(
-                    model="glm-4.6",
-                    messages=messages,
-                    temperature=0.7,
-                    max_tokens=1000
-                )
+                    # Add tool results to conversation. The assistant turn is
+                    # re-sent as just its tool calls: echoing the full message
+                    # would also ship its reasoning_content back as prompt
+                    history.append({
+                        "role": "assistant",
+                        "content": message.content or "",
+                        "tool_calls": [
+                            {
+                                "id": tool_call.id,
+                                "type": "function",
+                                "function": {
+                                    "name": tool_call.function.name,
+                                    "arguments": tool_call.function.arguments
+                                }
+                            }
+                            for tool_call, _ in tool_calls
+                        ]
+                    })
+                    history.extend(tool_results)  # Tool results
                 
-                return final_response.choices[0].message.content or "No response"
-            
-            # Check reasoning content
-            if hasattr(message, 'reasoning_content') and message.reasoning_content:
-                return message.reasoning_content
-            
-            # Regular response
-            return message.content or "No response available"
-            
-        except Exception as e:
-            return f"Error in chat: {str(e)}"
+                # The planner only picks tools; the synthesis model writes the answer
+                parts = []
+                async for content in self._stream_answer(history):
+                    parts.append(content)
+                    yield content
+                reply = "".join(parts)
+                if not reply:
+                    yield "No response"
+        except BaseException:
+            # Drop the half-finished turn so the history stays well formed
+            del history[turn_start:]
+            raise
+        
+        history.append({"role": "assistant", "content": reply})
+        self._trim_history()
     
     async def start_interactive_chat(self):
         """Start interactive chat session"""
-        print("\n" + "="*60)
-        print("Z.ai Chatbot with MCP Integration")
-        print("Type 'quit' or 'exit' to end the conversation")
-        print("Try: 'list files', 'analyze main.py', 'search for import'")
-        print("="*60 + "\n")
+        sys.stdout.write("\n".join([
+            "",
+            "="*60,
+            "Z.ai Chatbot with MCP Integration",
+            "Type 'quit' or 'exit' to end the conversation, 'new' to start over",
+            "Try: 'list files', 'analyze main.py', 'search for import'",
+            "Direct commands (no model call): /ls, /read <path>, /analyze <file>.py, /search <text>, /help",
+            "="*60 + "\n"
+        ]) + "\n")
         
         try:
             while True:
-                user_input = input("\nYou: ").strip()
+                # Background tasks (MCP reader, connection warm-up) keep
+                # running while the user types
+                user_input = (await _read_input("\nYou: ")).strip()
                 
                 if user_input.lower() in ['quit', 'exit']:
                     print("Goodbye!")
@@ -253,23 +603,36 @@ When users ask you to analyze files, read code, or explore the project, use the
                 if not user_input:
                     continue
                 
+                if user_input.lower() == 'new':
+                    self.reset_conversation()
+                    print("Started a new conversation")
+                    continue
+                
                 print("Assistant:", end=" ", flush=True)
-                response = await self.chat_with_mcp(user_input)
-                print(response)
+                async for piece in self.chat_with_mcp_stream(user_input):
+                    print(piece, end="", flush=True)
+                print()
                 
-        except KeyboardInterrupt:
+        # Under asyncio.run, Ctrl+C arrives as a cancellation of this task
+        except (KeyboardInterrupt, EOFError, asyncio.CancelledError):
             print("\nGoodbye!")
         finally:
             await self.cleanup()
     
     async def cleanup(self):
         """Clean up resources"""
-        if self.mcp_process:
+        for task in (self._warmup_task, self._reader_task):
+            if task:
+                task.cancel()
+        if self.mcp_process and self.mcp_process.returncode is None:
             try:
                 self.mcp_process.terminate()
-                self.mcp_process.wait(timeout=5)
-            except:
+                await asyncio.wait_for(self.mcp_process.wait(), timeout=5)
+            except asyncio.TimeoutError:
                 self.mcp_process.kill()
+                await self.mcp_process.wait()
+            except ProcessLookupError:
+                pass
 
 async def main():
     """Main function"""
@@ -295,4 +658,8 @@ async def main():
         await chatbot.cleanup()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        # asyncio.run re-raises Ctrl+C once main() has cleaned up
+        pass